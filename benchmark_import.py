@@ -0,0 +1,46 @@
+"""
+Import-time benchmark of the CLI entry point.
+
+Each statement is run in a fresh interpreter, several times, and the best wall time is kept:
+    python benchmark_import.py [--repeat 5]
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+
+STATEMENTS = {
+    'interpreter only': "pass",
+    'bike_investigation (lazy)': "import bike_investigation",
+    'bike_investigation --help': "import sys; sys.argv = ['bike', '--help']\ntry:\n    import bike_investigation; bike_investigation.main()\nexcept SystemExit:\n    pass",
+    'daemon client': "import daemon",
+    'tools.imports (numpy + pandas)': "import tools.imports",
+    'bike_investigation + load pandas': "import bike_investigation; bike_investigation.pd.DataFrame",
+}
+CHECK = "import sys, bike_investigation; print(sorted(m for m in ('numpy', 'pandas') if m in sys.modules))"
+
+
+def best_time(statement: str, repeat: int) -> float:
+    """Returns the best wall time, in seconds, of running statement in a fresh interpreter."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help="runs per statement")
+    args = parser.parse_args()
+
+    for name, statement in STATEMENTS.items():
+        print(f"{name:<35} {best_time(statement, args.repeat) * 1000:8.1f} ms")
+    loaded = subprocess.run([sys.executable, '-c', CHECK], check=True, capture_output=True, text=True).stdout.strip()
+    print(f"Heavy modules loaded by 'import bike_investigation': {loaded}")
+
+
+if __name__ == "__main__":
+    main()
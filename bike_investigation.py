@@ -1,4 +1,12 @@
-from tools.imports import *
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+# numpy and pandas are imported on first use, so that get_filters() and the daemon client start fast
+from tools.lazy import np, pd
 from tools.constants import *
 from tools.utils import *
 
@@ -19,9 +27,9 @@ def get_filters()-> Tuple[str, str, str]:
     print("Hello! Let's explore some bikeshare data!")
 
 
-    cities = ['chicago', 'new york city', 'washington']
-    months = ['january', 'february', 'march', 'april', 'may', 'june','all'] 
-    days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday', 'all']
+    cities = list(CITY_DATA)
+    months = MONTHS
+    days = DAYS
     
 
     # Get user input for city
@@ -52,7 +60,7 @@ def get_filters()-> Tuple[str, str, str]:
     return city, month, day
 
 
-def load_data(city: str, month: str, day: str) -> pd.DataFrame:
+def load_data(city: str, month: str, day: str, normalized: bool = False) -> pd.DataFrame:
     """
     Loads data for the specified city and filters by month and day if applicable.
 
@@ -60,6 +68,7 @@ def load_data(city: str, month: str, day: str) -> pd.DataFrame:
         (str) city - name of the city to analyze
         (str) month - name of the month to filter by, or "all" to apply no month filter
         (str) day - name of the day of week to filter by, or "all" to apply no day filter
+        (bool) normalized - load the normalized data (see normalize.load_normalized) instead of the raw CSV
     Returns:
         (pd.DataFrame) - Pandas DataFrame containing city data filtered by month and day.
     Raises:
@@ -73,10 +82,15 @@ def load_data(city: str, month: str, day: str) -> pd.DataFrame:
         raise KeyError(f"There is no data for {city} city")
     path = CITY_DATA[city]
 
-    # Load data from CSV into a DataFrame
+    # Load data from CSV into a DataFrame, or from the normalized data already converted
     try:
-        df = pd.read_csv(path)
-        log.info(f"Successfully loaded data for {city} from {path}")
+        if normalized:
+            from normalize import load_normalized
+            df, _ = load_normalized(city)
+            log.info(f"Successfully loaded normalized data for {city} from {NORMALIZED_DIR}")
+        else:
+            df = pd.read_csv(path)
+            log.info(f"Successfully loaded data for {city} from {path}")
     except ValueError:
         raise ValueError("Error while loading {city} to DataFrame")
     except Exception as err:
@@ -86,19 +100,36 @@ def load_data(city: str, month: str, day: str) -> pd.DataFrame:
     if START_TIME not in df.columns:
         raise KeyError(f"The dataframe doesn't contain a Start Time column")
     # Convert the 'Start Time' column to datetime
-    try:
-        df[START_TIME] = pd.to_datetime(df[START_TIME], errors='coerce')
-        log.info("Start Time column successfully converted to datetime")
-    except ValueError:
-        log.error("Could not convert 'Start Time' to datetime.")
-    except Exception as err:
-        log.error(f"Unexpected {err=}, {type(err)=}")
-        raise
+    if not pd.api.types.is_datetime64_any_dtype(df[START_TIME]):
+        try:
+            df[START_TIME] = pd.to_datetime(df[START_TIME], errors='coerce')
+            log.info("Start Time column successfully converted to datetime")
+        except ValueError:
+            log.error("Could not convert 'Start Time' to datetime.")
+        except Exception as err:
+            log.error(f"Unexpected {err=}, {type(err)=}")
+            raise
+    return filter_data(df, month, day)
+
+
+def filter_data(df: pd.DataFrame, month: str, day: str) -> pd.DataFrame:
+    """
+    Filters city data by month and day if applicable, adding the month and day of week columns if missing.
+
+    Args:
+        (pd.DataFrame) df - city data with a datetime 'Start Time' column
+        (str) month - name of the month to filter by, or "all" to apply no month filter
+        (str) day - name of the day of week to filter by, or "all" to apply no day filter
+    Returns:
+        (pd.DataFrame) - Pandas DataFrame containing city data filtered by month and day.
+    """
     # Extract month and day of week from 'Start Time' column
-    df[MONTH] = df[START_TIME].dt.month_name().str.lower()
-    
+    if MONTH not in df.columns:
+        df[MONTH] = df[START_TIME].dt.month_name().str.lower()
+    if DAY not in df.columns:
+        df[DAY] = df[START_TIME].dt.day_name().str.lower()
+
     # Filter by month if applicable
-    df[DAY] = df[START_TIME].dt.day_name().str.lower()
     if month != 'all':
         df = df[df[MONTH] == month.lower()]
     
@@ -109,8 +140,6 @@ def load_data(city: str, month: str, day: str) -> pd.DataFrame:
     return df
 
 
-
-
 def time_stats(df: pd.DataFrame) -> Dict:
     """
     Analyzes and displays statistics on the most frequent times of travel from a given DataFrame.
@@ -140,33 +169,43 @@ def time_stats(df: pd.DataFrame) -> Dict:
     if START_TIME not in df.columns:
         raise KeyError(f"The dataframe doesn't contain a Start Time column")
 
-    # Prepare dataframe for analyzes
-    try:
-        df[START_TIME] = pd.to_datetime(df[START_TIME], errors='coerce')
-        log.info("Succefully convert Start Time colonne")
-    except ValueError:
-        log.error("Error converting 'Start Time' colum to datetime")
-    except Exception as err:
-        log.error(f"Unexpected {err=}, {type(err)=}")
-        raise
-    df = df.dropna(subset=[START_TIME])
-    if df.empty:
+    # Prepare dataframe for analyzes, normalized data is already converted.
+    # The given dataframe is never modified, so it can be shared between threads
+    start = df[START_TIME]
+    if not pd.api.types.is_datetime64_any_dtype(start):
+        try:
+            start = pd.to_datetime(start, errors='coerce')
+            log.info("Succefully convert Start Time colonne")
+        except ValueError:
+            log.error("Error converting 'Start Time' colum to datetime")
+        except Exception as err:
+            log.error(f"Unexpected {err=}, {type(err)=}")
+            raise
+    valid = start.notna()
+    if not valid.any():
         raise ValueError("No valid 'Start Time' data available")
+    start = start[valid]
 
     # Find and display the most common day of week
-    if DAY not in df.columns:
-        df[DAY] = df[START_TIME].dt.day_name().str.lower()
-    most_common_day = find_most_common(df[DAY], 'day of week')
+    if DAY in df.columns:
+        days = df[DAY][valid]
+    else:
+        days = start.dt.day_name().str.lower()
+    most_common_day = find_most_common(days, 'day of week')
 
     # Find and display the most common month
-    if MONTH not in df.columns:
-        df[MONTH] = df[START_TIME].dt.month_name().str.lower()
-    most_common_month = find_most_common(df[MONTH], MONTH)
+    if MONTH in df.columns:
+        months = df[MONTH][valid]
+    else:
+        months = start.dt.month_name().str.lower()
+    most_common_month = find_most_common(months, MONTH)
     
     # Find and display the most common start hour
-    if 'start_hour' not in df.columns:
-        df['start_hour'] = df[START_TIME].dt.hour
-    most_common_start_hour = find_most_common(df['start_hour'], 'start hour')
+    if 'start_hour' in df.columns:
+        hours = df['start_hour'][valid]
+    else:
+        hours = start.dt.hour
+    most_common_start_hour = find_most_common(hours, 'start hour')
 
     print("\nThis took %s seconds." % (time.time() - start_time))
     print("-" * 40)
@@ -217,8 +256,8 @@ def station_stats(df: pd.DataFrame) -> Dict:
     most_common_end_station = find_most_common(df['End Station'], 'end station')
 
     # Find and display most frequent combination of start station and end station trip
-    df['trip_combination'] = df['Start Station'] + " -> " + df['End Station']
-    most_common_trip = find_most_common(df['trip_combination'], 'trip combination')
+    trip_combination = df['Start Station'] + " -> " + df['End Station']
+    most_common_trip = find_most_common(trip_combination, 'trip combination')
 
     print("\nThis took %s seconds." % (time.time() - start_time))
     print("-" * 40)
@@ -259,15 +298,18 @@ def trip_duration_stats(df):
     if 'Trip Duration' not in df.columns:
         raise KeyError("No valid 'Trip Duration' column found.")
 
-    # Prepare dataframe for analyzes
-    try:
-        durations = pd.to_numeric(df['Trip Duration'], errors='coerce').dropna()
-        log.info("Succefully convert 'Trip Duration' colonne")
-    except ValueError:
-        log.error("Error converting 'Trip Duration' colum to numeric")
-    except Exception as err:
-        log.error(f"Unexpected {err=}, {type(err)=}")
-        raise
+    # Prepare dataframe for analyzes, normalized data is already converted
+    if pd.api.types.is_numeric_dtype(df['Trip Duration']):
+        durations = df['Trip Duration'].dropna()
+    else:
+        try:
+            durations = pd.to_numeric(df['Trip Duration'], errors='coerce').dropna()
+            log.info("Succefully convert 'Trip Duration' colonne")
+        except ValueError:
+            log.error("Error converting 'Trip Duration' colum to numeric")
+        except Exception as err:
+            log.error(f"Unexpected {err=}, {type(err)=}")
+            raise
     if len(durations) == 0:
         raise ValueError("No valid 'Trip Duration' data.")
 
@@ -332,7 +374,8 @@ def user_stats(df):
     else:
         log.warning("No 'User Type' column found in the DataFrame.")
 
-    if 'Gender' in df.columns:
+    # Normalized data of a city without gender has an empty 'Gender' column
+    if 'Gender' in df.columns and df['Gender'].notna().any():
         # Calculate counts of gender and display it 
         gender_counts = df['Gender'].value_counts().to_dict()
         res['Gender'] = gender_counts
@@ -342,11 +385,12 @@ def user_stats(df):
         log.warning("No 'Gender' column found in the DataFrame.")
 
     if 'Birth Year' in df.columns:
-        # Prepare 'Birth Year' col to analyse
+        # Prepare 'Birth Year' col to analyse, normalized data is already converted
         try:
-            df['Birth Year'] = pd.to_numeric(df['Birth Year'],errors='coerce')
-            df = df.dropna(subset=['Birth Year']).copy()
-            df['Birth Year'] = df['Birth Year'].astype(int)
+            birth_years = df['Birth Year']
+            if not pd.api.types.is_numeric_dtype(birth_years):
+                birth_years = pd.to_numeric(birth_years, errors='coerce')
+            birth_years = birth_years.dropna().astype(int)
         except ValueError:
             log.error("Error converting 'Trip Duration' colum to numeric")
         except Exception as err:
@@ -354,10 +398,10 @@ def user_stats(df):
             raise
 
         # Calculate the earliest, the most recent and the most commun 'Birth Year' and display it
-        if df['Birth Year'].size > 0:
-            earliest_birth = min(df['Birth Year'])
-            most_recent_birth = max(df['Birth Year'])
-            most_common_birth = find_most_common(df['Birth Year'], 'Birth Year')
+        if birth_years.size > 0:
+            earliest_birth = min(birth_years)
+            most_recent_birth = max(birth_years)
+            most_common_birth = find_most_common(birth_years, 'Birth Year')
             res['earliest_birth'] = earliest_birth
             res['most_recent_birth'] = most_recent_birth
             res['most_common_birth'] = most_common_birth
@@ -373,17 +417,85 @@ def user_stats(df):
     return res
 
 
-def main():
+def display_stats(df: pd.DataFrame) -> None:
+    """
+    Displays the time, station, trip duration and user statistics of the given data.
+
+    Args:
+        (pd.DataFrame) df - city data, as returned by load_data
+    """
+    time_stats(df)
+    station_stats(df)
+    trip_duration_stats(df)
+    user_stats(df)
+
+
+def run_query(city: str, month: str, day: str, use_daemon: bool = True) -> None:
+    """
+    Displays the statistics of a query, through the warm daemon if one is running, else by loading the data here.
+
+    Args:
+        (str) city - name of the city to analyze
+        (str) month - name of the month to filter by, or "all" to apply no month filter
+        (str) day - name of the day of week to filter by, or "all" to apply no day filter
+        (bool) use_daemon - try the daemon first
+    """
+    if use_daemon:
+        from daemon import ask_daemon
+        reply = ask_daemon({'city': city, 'month': month, 'day': day})
+        if reply is not None:
+            print(reply['output'], end='')
+            if reply['error']:
+                log.error(f"The daemon could not answer: {reply['error']}")
+            return
+    df = load_data(city, month, day)
+    display_stats(df)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line. Without --city, the filters are asked interactively.
+
+    Args:
+        (list) argv - command line arguments, sys.argv[1:] if None
+    Returns:
+        (argparse.Namespace) - the parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Explore US bikeshare data.")
+    parser.add_argument('--city', choices=list(CITY_DATA), help="city to analyze, skips the questions")
+    parser.add_argument('--month', choices=MONTHS, default='all', help="month to filter by")
+    parser.add_argument('--day', choices=DAYS, default='all', help="day of week to filter by")
+    parser.add_argument('--no-daemon', action='store_true', help="do not use a running daemon")
+    parser.add_argument('--serve', action='store_true', help="start the warm daemon, preloading --city if given")
+    parser.add_argument('--stop', action='store_true', help="stop the running daemon")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if args.serve:
+        from daemon import Daemon
+        daemon = Daemon()
+        if args.city:
+            daemon.load(args.city)
+        daemon.serve_forever()
+        return
+    if args.stop:
+        from daemon import ask_daemon
+        reply = ask_daemon({'command': 'stop'})
+        if reply is None:
+            print("No daemon is running.")
+        else:
+            print(reply['output'], end='')
+        return
+    if args.city:
+        run_query(args.city, args.month, args.day, not args.no_daemon)
+        return
+
     while True:
         city, month, day = get_filters()
         print(f"You choose this filter : city = {city}, month = {month}, day = {day}")
-        df = load_data(city, month, day)
-        # df = load_data('chicago', 'all', 'all')
-
-        time_stats(df)
-        station_stats(df)
-        trip_duration_stats(df)
-        user_stats(df)
+        run_query(city, month, day, not args.no_daemon)
 
         restart = input("\nWould you like to restart? Enter yes or no.\n")
         if restart.lower() != "yes":
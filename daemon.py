@@ -0,0 +1,196 @@
+import io
+import logging
+import os
+import secrets
+import socket
+import struct
+import sys
+from contextlib import redirect_stdout
+from multiprocessing.connection import AuthenticationError, Connection, answer_challenge, deliver_challenge
+from typing import Dict, Optional, Tuple
+
+from tools.constants import *
+
+
+log = logging.getLogger("Bike")
+
+
+def _create_key(key_file: str) -> bytes:
+    """Writes a new random key to key_file, readable and writable by its owner only."""
+    key_file = os.path.expanduser(key_file)
+    os.makedirs(os.path.dirname(key_file), mode=0o700, exist_ok=True)
+    key = secrets.token_bytes(32)
+    fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as file:
+        os.chmod(key_file, 0o600)
+        file.write(key)
+    return key
+
+
+def _read_key(key_file: str) -> Optional[bytes]:
+    """Returns the key of key_file, or None if it is missing or readable by other users."""
+    key_file = os.path.expanduser(key_file)
+    try:
+        info = os.stat(key_file)
+        if info.st_mode & 0o077 or (hasattr(os, 'getuid') and info.st_uid != os.getuid()):
+            log.warning(f"Ignoring daemon key {key_file}: it must belong to you and be private (chmod 600)")
+            return None
+        with open(key_file, 'rb') as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+def _set_timeout(sock: socket.socket, timeout: float) -> None:
+    """Makes the blocking reads and writes on sock fail with an OSError after timeout seconds."""
+    if sys.platform == 'win32':
+        value = struct.pack('L', int(timeout * 1000))
+    else:
+        value = struct.pack('ll', int(timeout), int(timeout % 1 * 1e6))
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, value)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, value)
+
+
+def _connection(sock: socket.socket, timeout: float) -> Connection:
+    """
+    Wraps a connected socket in a Connection whose reads and writes fail with an OSError after timeout seconds.
+    The timeout is set on the socket itself, so it also covers the authentication challenge.
+    """
+    sock.setblocking(True)
+    _set_timeout(sock, timeout)
+    return Connection(sock.detach())
+
+
+class Daemon:
+    """
+    Long-running process keeping the city data loaded, so that repeated CLI invocations skip the
+    pandas import and the data loading.
+
+    Each city is loaded once from its normalized data (see normalize.load_normalized) and filtered by month
+    and day for every request with filter_data, as load_data does. Requests are answered one at a time, and
+    the stats output is sent back to the client. Restart the daemon to reload changed data.
+
+    Clients must know the random key written to key_file when the daemon starts, the file being readable by
+    its owner only. Both sides check that the other one knows the key before exchanging any message, and a
+    connection silent for more than timeout seconds is dropped.
+
+    Example:
+        python bike_investigation.py --serve --city chicago
+        python bike_investigation.py --city chicago --month march
+    """
+
+    def __init__(self, address: Tuple[str, int] = DAEMON_ADDRESS, key_file: str = DAEMON_KEY_FILE,
+                 directory: str = NORMALIZED_DIR, timeout: float = DAEMON_TIMEOUT):
+        """
+        Args:
+            (tuple) address - (host, port) to listen on, port 0 picks a free port
+            (str) key_file - where the key is written
+            (str) directory - where the normalized data is stored
+            (float) timeout - seconds a connection may stay silent
+        """
+        self._socket = socket.create_server(address)
+        self.address = self._socket.getsockname()[:2]
+        self._key_file = key_file
+        self._key = _create_key(key_file)
+        self._directory = directory
+        self._timeout = timeout
+        self._data = {}
+
+    def load(self, city: str):
+        """
+        Loads the normalized data of a city if it is not loaded yet.
+
+        Args:
+            (str) city - name of the city to load
+        Returns:
+            (pd.DataFrame) - the unfiltered city data, with the month and day of week columns.
+        """
+        if city not in self._data:
+            from bike_investigation import filter_data
+            from normalize import load_normalized
+            if city not in CITY_DATA:
+                raise KeyError(f"There is no data for {city} city")
+            df, _ = load_normalized(city, self._directory)
+            self._data[city] = filter_data(df, 'all', 'all')
+        return self._data[city]
+
+    def handle(self, request: Dict) -> Dict:
+        """
+        Answers a stats request.
+
+        Args:
+            (dict) request - 'city', 'month' and 'day' of the query, as given to load_data
+        Returns:
+            dict: Contains:
+                - 'output': what the stats functions printed,
+                - 'error': the error raised while answering, or None.
+        """
+        from bike_investigation import display_stats, filter_data
+
+        buffer = io.StringIO()
+        error = None
+        try:
+            df = filter_data(self.load(request['city']), request['month'], request['day'])
+            with redirect_stdout(buffer):
+                display_stats(df)
+        except Exception as err:
+            # The daemon keeps serving, the client reports the error
+            log.error(f"Could not answer {request}: {err=}")
+            error = f"{type(err).__name__}: {err}"
+        return {'output': buffer.getvalue(), 'error': error}
+
+    def serve_forever(self) -> None:
+        """Answers requests until a stop command is received, then removes the key file."""
+        log.info(f"Daemon listening on {self.address}")
+        try:
+            while True:
+                sock, _ = self._socket.accept()
+                try:
+                    with _connection(sock, self._timeout) as conn:
+                        deliver_challenge(conn, self._key)
+                        answer_challenge(conn, self._key)
+                        request = conn.recv()
+                        if not isinstance(request, dict):
+                            raise ValueError(f"Invalid request {request!r}")
+                        if request.get('command') == 'stop':
+                            conn.send({'output': "Daemon stopped.\n", 'error': None})
+                            break
+                        conn.send(self.handle(request))
+                except (EOFError, OSError, ValueError, AuthenticationError) as err:
+                    log.warning(f"Dropped daemon connection: {err=}")
+        finally:
+            self._socket.close()
+            if _read_key(self._key_file) == self._key:
+                os.remove(os.path.expanduser(self._key_file))
+
+
+def ask_daemon(request: Dict, address: Tuple[str, int] = DAEMON_ADDRESS, key_file: str = DAEMON_KEY_FILE,
+               timeout: float = DAEMON_TIMEOUT, reply_timeout: float = DAEMON_REPLY_TIMEOUT) -> Optional[Dict]:
+    """
+    Sends a request to the daemon.
+
+    Args:
+        (dict) request - 'city', 'month' and 'day' of the query, or {'command': 'stop'}
+        (tuple) address - (host, port) the daemon listens on
+        (str) key_file - where the daemon wrote its key
+        (float) timeout - seconds to wait for the daemon while connecting and authenticating
+        (float) reply_timeout - seconds to wait for the reply, which includes loading the city on its first request
+    Returns:
+        (dict) - the daemon reply (see Daemon.handle), or None if no daemon with our key answers in time.
+    """
+    key = _read_key(key_file)
+    if key is None:
+        return None
+    try:
+        sock = socket.create_connection(address, timeout=timeout)
+        with _connection(sock, timeout) as conn:
+            answer_challenge(conn, key)
+            deliver_challenge(conn, key)
+            conn.send(request)
+            # fromfd duplicates the descriptor, the timeout applies to the shared socket
+            with socket.fromfd(conn.fileno(), sock.family, socket.SOCK_STREAM) as shared:
+                _set_timeout(shared, reply_timeout)
+            return conn.recv()
+    except (OSError, EOFError, AuthenticationError) as err:
+        log.debug(f"No daemon answer on {address}: {err=}")
+        return None
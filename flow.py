@@ -0,0 +1,131 @@
+from tools.imports import *
+from tools.constants import *
+from normalize import parse_times
+
+
+log = logging.getLogger("Bike")
+
+
+def _trip_times(df: pd.DataFrame) -> Tuple[pd.DatetimeIndex, pd.DatetimeIndex, np.ndarray]:
+    """
+    Returns the start and end times of the valid trips, parsed with parse_times if needed, and the boolean
+    mask of the valid trips in df. Trips with a missing time or ending before they start are skipped.
+    """
+    if df.empty:
+        raise ValueError("The given dataframe is empty")
+    if START_TIME not in df.columns or END_TIME not in df.columns:
+        raise KeyError("The dataframe doesn't contain Start Time and End Time columns")
+    start, end = df[START_TIME], df[END_TIME]
+    if not is_datetime64_any_dtype(start):
+        start = parse_times(start)
+    if not is_datetime64_any_dtype(end):
+        end = parse_times(end)
+    valid = (start.notna() & end.notna() & (end >= start)).to_numpy()
+    if not valid.any():
+        raise ValueError("No valid 'Start Time' and 'End Time' data available")
+    if not valid.all():
+        log.warning(f"{int((~valid).sum())} trips without valid times skipped")
+    return pd.DatetimeIndex(start.to_numpy()[valid]), pd.DatetimeIndex(end.to_numpy()[valid]), valid
+
+
+def concurrency(df: pd.DataFrame) -> pd.Series:
+    """
+    Computes the number of trips in progress over time with a sweep line: every start is a +1 event and
+    every end a -1 event, the events are sorted once and their cumulative sum is the number of bikes in use.
+    A trip counts from its start time until, but not including, its end time.
+
+    Args:
+        (pd.DataFrame) df - trips with 'Start Time' and 'End Time' columns
+    Returns:
+        (pd.Series) - number of trips in progress from each event time until the next one.
+    Raises:
+        ValueError: If the DataFrame is empty or has no valid trip times.
+        KeyError: If the 'Start Time' or 'End Time' column is missing.
+    """
+    start, end, _ = _trip_times(df)
+    times = np.concatenate([start.to_numpy(), end.to_numpy()])
+    deltas = np.concatenate([np.ones(len(start), dtype=np.int64), -np.ones(len(end), dtype=np.int64)])
+    # Sorted by time, ends before starts at the same time
+    order = np.lexsort((deltas, times))
+    in_use = pd.Series(np.cumsum(deltas[order]), index=pd.DatetimeIndex(times[order], name='time'), name='trips')
+    # Keep the count after the last event of each time
+    return in_use[~in_use.index.duplicated(keep='last')]
+
+
+def hourly_concurrency(in_use: pd.Series) -> pd.Series:
+    """
+    Returns the maximum number of trips in progress during each hour.
+
+    Args:
+        (pd.Series) in_use - number of trips in progress, as returned by concurrency()
+    Returns:
+        (pd.Series) - maximum number of trips in progress, indexed by hour.
+    """
+    event_max = in_use.resample('h').max()
+    # Count carried over from the previous hour, for hours without event or starting above their events
+    carried = in_use.resample('h').last().ffill().shift(1).fillna(0)
+    return np.maximum(event_max.fillna(carried), carried).astype(np.int64)
+
+
+def station_flow(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Counts the departures and arrivals of each station per hour.
+
+    Args:
+        (pd.DataFrame) df - trips with 'Start Time', 'End Time', 'Start Station' and 'End Station' columns
+    Returns:
+        (pd.DataFrame) - indexed by (station, hour), with columns:
+            - 'departures': trips starting from the station during the hour,
+            - 'arrivals': trips ending at the station during the hour,
+            - 'net_flow': arrivals minus departures, positive when bikes pile up at the station.
+    Raises:
+        KeyError: If a required column is missing.
+    """
+    if 'Start Station' not in df.columns or 'End Station' not in df.columns:
+        raise KeyError(" dataframe doesn't contain required station columns")
+    start, end, valid = _trip_times(df)
+    # Grouped on arrays, so that duplicate index labels in df do not matter
+    trips = df[valid]
+    departures = trips.groupby([trips['Start Station'].to_numpy(), start.floor('h')]).size()
+    arrivals = trips.groupby([trips['End Station'].to_numpy(), end.floor('h')]).size()
+    flow = pd.concat([departures.rename('departures'), arrivals.rename('arrivals')], axis=1).fillna(0).astype(np.int64)
+    flow.index.names = ['station', 'hour']
+    flow['net_flow'] = flow['arrivals'] - flow['departures']
+    return flow.sort_index()
+
+
+def flow_stats(df: pd.DataFrame) -> Dict:
+    """
+    Computes the trips in progress over time and the hourly flow of each station, for fleet rebalancing.
+
+    Args:
+        (pd.DataFrame) df - trips with 'Start Time', 'End Time', 'Start Station' and 'End Station' columns
+
+    Returns:
+        dict: Contains:
+            - 'peakConcurrentTrips': the maximum number of trips in progress,
+            - 'peakTime': when this maximum was first reached,
+            - 'concurrency': the maximum number of trips in progress per hour,
+            - 'stationFlow': the hourly departures, arrivals and net flow of each station.
+
+    Raises:
+        ValueError: If the DataFrame is empty or has no valid trip times.
+        KeyError: If a required column is missing.
+    """
+    print("\nCalculating Bikes In Use and Station Flow...\n")
+    start_time = time.time()
+
+    in_use = concurrency(df)
+    peak_time = in_use.idxmax()
+    peak = int(in_use[peak_time])
+    print(f"Peak of concurrent trips: {peak} at {peak_time}")
+    flow = station_flow(df)
+
+    print("\nThis took %s seconds." % (time.time() - start_time))
+    print("-" * 40)
+    return {
+        'peakConcurrentTrips': peak,
+        'peakTime': peak_time,
+        'concurrency': hourly_concurrency(in_use),
+        'stationFlow': flow,
+    }
@@ -0,0 +1,162 @@
+import json
+import os
+
+from tools.imports import *
+from tools.constants import *
+
+
+log = logging.getLogger("Bike")
+
+
+def parse_times(col: pd.Series) -> pd.Series:
+    """
+    Converts a column of timestamps to datetime, trying each format of TIME_FORMATS on the values
+    that are still unparsed.
+
+    Args:
+        (pd.Series) col - raw timestamps
+    Returns:
+        (pd.Series) - datetime Series, NaT where no format matches.
+    """
+    parsed = pd.Series(pd.NaT, index=col.index, dtype='datetime64[ns]')
+    for fmt in TIME_FORMATS:
+        todo = parsed.isna() & col.notna()
+        if not todo.any():
+            break
+        parsed[todo] = pd.to_datetime(col[todo].astype(str), format=fmt, errors='coerce')
+    return parsed
+
+
+def normalize(df: pd.DataFrame, city: Optional[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame, Dict]:
+    """
+    Maps raw city data to the canonical schema and quarantines invalid rows.
+
+    Every city gets the same columns, REQUIRED_COLUMNS then OPTIONAL_COLUMNS, the optional columns
+    missing from the raw data being filled with NA ('Gender' as object, 'Birth Year' as float).
+    Timestamps are converted to datetime, 'Trip Duration' and 'Birth Year' to numbers. A row is invalid
+    when a timestamp can not be parsed, the trip duration is not a positive number or a station is missing.
+    An unparsable 'Birth Year' is set to NaN without quarantining the row.
+
+    Args:
+        (pd.DataFrame) df - raw city data
+        (str) city - name of the city, only used in the report
+    Returns:
+        (pd.DataFrame) - valid rows, with the canonical columns and types.
+        (pd.DataFrame) - invalid rows with their raw values and an 'invalid_columns' column.
+        (dict) - validation report, see normalization report in the README.
+    Raises:
+        KeyError: If a required column is missing.
+    """
+    missing_required = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_required:
+        raise KeyError(f"The dataframe doesn't contain required columns {missing_required}")
+    columns = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+
+    out = df[REQUIRED_COLUMNS].copy()
+    out[START_TIME] = parse_times(df[START_TIME])
+    out[END_TIME] = parse_times(df[END_TIME])
+    out['Trip Duration'] = pd.to_numeric(df['Trip Duration'], errors='coerce')
+    if 'Gender' in df.columns:
+        out['Gender'] = df['Gender'].astype(object)
+    else:
+        out['Gender'] = pd.Series(np.nan, index=df.index, dtype=object)
+    if 'Birth Year' in df.columns:
+        out['Birth Year'] = pd.to_numeric(df['Birth Year'], errors='coerce').astype(float)
+    else:
+        out['Birth Year'] = pd.Series(np.nan, index=df.index, dtype=float)
+
+    invalid = pd.DataFrame({
+        START_TIME: out[START_TIME].isna(),
+        END_TIME: out[END_TIME].isna(),
+        'Trip Duration': ~(out['Trip Duration'] > 0),
+        'Start Station': out['Start Station'].isna(),
+        'End Station': out['End Station'].isna(),
+    })
+    bad = invalid.any(axis=1)
+
+    clean = out[~bad].reset_index(drop=True)
+    quarantine = df[bad].copy()
+    flags = invalid[bad]
+    quarantine['invalid_columns'] = [', '.join(flags.columns[row]) for row in flags.to_numpy()]
+
+    coerced = {}
+    if 'Birth Year' in df.columns:
+        coerced['Birth Year'] = int((out['Birth Year'].isna() & df['Birth Year'].notna() & ~bad).sum())
+
+    report = {
+        'city': city,
+        'rows': int(len(df)),
+        'valid_rows': int(len(clean)),
+        'quarantined_rows': int(bad.sum()),
+        'invalid': {col: int(count) for col, count in invalid.sum().items()},
+        'coerced': coerced,
+        'missing_columns': [col for col in OPTIONAL_COLUMNS if col not in df.columns],
+        'dropped_columns': [col for col in df.columns if col not in columns],
+    }
+    return clean, quarantine, report
+
+
+def _stored_paths(city: str, directory: str) -> Dict[str, str]:
+    """Returns the paths of the stored data, quarantine and report of a city."""
+    name = os.path.splitext(os.path.basename(CITY_DATA[city]))[0]
+    return {
+        'data': os.path.join(directory, f"{name}.pkl"),
+        'quarantine': os.path.join(directory, f"{name}_quarantine.pkl"),
+        'report': os.path.join(directory, f"{name}_report.json"),
+    }
+
+
+def normalize_city(city: str, directory: str = NORMALIZED_DIR) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Normalizes the raw data of a city and stores the result, the quarantined rows and the report in directory.
+
+    Args:
+        (str) city - name of the city to normalize
+        (str) directory - where the normalized data is stored
+    Returns:
+        (pd.DataFrame) - the normalized city data.
+        (dict) - the validation report.
+    Raises:
+        TypeError: If the city is not a str
+        KeyError: If there is no data for the city or a required column is missing.
+    """
+    if not isinstance(city, str):
+        raise TypeError("City must be a str parameter")
+    if city not in CITY_DATA:
+        raise KeyError(f"There is no data for {city} city")
+
+    raw = pd.read_csv(CITY_DATA[city])
+    clean, quarantine, report = normalize(raw, city)
+    if report['quarantined_rows']:
+        log.warning(f"{report['quarantined_rows']} invalid rows quarantined for {city}: {report['invalid']}")
+
+    paths = _stored_paths(city, directory)
+    os.makedirs(directory, exist_ok=True)
+    clean.to_pickle(paths['data'])
+    quarantine.to_pickle(paths['quarantine'])
+    with open(paths['report'], 'w') as file:
+        json.dump(report, file, indent=2)
+    log.info(f"Normalized data for {city} stored in {directory}")
+    return clean, report
+
+
+def load_normalized(city: str, directory: str = NORMALIZED_DIR, refresh: bool = False) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Loads the normalized data of a city, normalizing it first if it is not stored or older than the raw file.
+
+    Args:
+        (str) city - name of the city to load
+        (str) directory - where the normalized data is stored
+        (bool) refresh - normalize again even if stored data is up to date
+    Returns:
+        (pd.DataFrame) - the normalized city data.
+        (dict) - the validation report.
+    """
+    if city in CITY_DATA and not refresh:
+        paths = _stored_paths(city, directory)
+        if all(os.path.exists(path) for path in paths.values()) \
+                and os.path.getmtime(paths['data']) >= os.path.getmtime(CITY_DATA[city]):
+            with open(paths['report']) as file:
+                report = json.load(file)
+            return pd.read_pickle(paths['data']), report
+    return normalize_city(city, directory)
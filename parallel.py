@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.imports import *
+from tools.constants import *
+from query import FILTER_COLUMNS, STATS_FUNCTIONS, check_filters, check_groups
+from normalize import load_normalized
+
+
+log = logging.getLogger("Bike")
+
+
+class SharedCity:
+    """
+    Read-only view over the loaded data of one city, answering several queries at once.
+
+    The data is copied once and the derived columns are added at construction, then it is never
+    modified: each query selects its rows with a boolean mask and the stats functions do not modify
+    their input, so the stats groups of every query run in parallel on a thread pool.
+
+    The stats functions still print their results and timings from the pool threads, so with several
+    queries the printed lines are not ordered and do not tell which query they belong to. Only the
+    returned results are ordered: use them, not the printed output.
+
+    Example:
+        with SharedCity.from_city('chicago') as city:
+            results = city.run([{'month': 'march'}, {'user_type': 'Customer', 'day': 'sunday'}], ['time', 'station'])
+    """
+
+    def __init__(self, df: pd.DataFrame, max_workers: Optional[int] = None):
+        """
+        Args:
+            (pd.DataFrame) df - city data, which must include a 'Start Time' column
+            (int) max_workers - number of threads of the pool, ThreadPoolExecutor's default if None
+        Raises:
+            ValueError: If the DataFrame is empty.
+            KeyError: If the 'Start Time' column is missing.
+        """
+        if df.empty:
+            raise ValueError("The given dataframe is empty")
+        if START_TIME not in df.columns:
+            raise KeyError(f"The dataframe doesn't contain a Start Time column")
+        df = df.copy()
+        if not is_datetime64_any_dtype(df[START_TIME]):
+            df[START_TIME] = pd.to_datetime(df[START_TIME], errors='coerce')
+        df[MONTH] = df[START_TIME].dt.month_name().str.lower()
+        df[DAY] = df[START_TIME].dt.day_name().str.lower()
+        df['start_hour'] = df[START_TIME].dt.hour
+        self._df = df
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Bike")
+
+    @classmethod
+    def from_city(cls, city: str, directory: str = NORMALIZED_DIR, max_workers: Optional[int] = None) -> 'SharedCity':
+        """
+        Builds a SharedCity from the normalized data of a city (see normalize.load_normalized).
+
+        Args:
+            (str) city - name of the city to load
+            (str) directory - where the normalized data is stored
+            (int) max_workers - number of threads of the pool
+        Returns:
+            (SharedCity) - the shared view over the city data.
+        """
+        df, _ = load_normalized(city, directory)
+        return cls(df, max_workers)
+
+    def __enter__(self) -> 'SharedCity':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shuts the thread pool down, waiting for the running stats."""
+        self._pool.shutdown(wait=True)
+
+    def select(self, **filters: str) -> pd.DataFrame:
+        """
+        Returns the rows matching the filters, as a new DataFrame.
+
+        Args:
+            (str) filters - values keyed by filter keyword (month, day, user_type, gender, start_station, end_station)
+        Returns:
+            (pd.DataFrame) - the matching rows, the shared data is left unchanged.
+        Raises:
+            KeyError: If a filter keyword is unknown or its column is missing.
+        """
+        filters = check_filters(filters)
+        mask = np.ones(len(self._df), dtype=bool)
+        for key, value in filters.items():
+            col = FILTER_COLUMNS[key]
+            if col not in self._df.columns:
+                raise KeyError(f"The dataframe doesn't contain a {col} column")
+            mask &= (self._df[col] == value).to_numpy()
+        return self._df[mask]
+
+    def run(self, queries: List[Dict[str, str]], groups: Union[str, List[str], None] = None) -> List[Dict]:
+        """
+        Answers several queries at once, every (query, stats group) pair running on the thread pool.
+
+        Args:
+            (list) queries - filters of each query, as given to select()
+            (str or list) groups - stats groups to compute (time, station, duration, user, flow), DEFAULT_GROUPS if None
+        Returns:
+            (list) - for each query, in the same order, the result of each stats function keyed by group name.
+                The output printed by the stats functions is interleaved between queries.
+        Raises:
+            Any error raised by select() or by a stats function, e.g. ValueError if no row matches a query.
+        """
+        groups = check_groups(groups)
+        frames = [self.select(**filters) for filters in queries]
+        futures = [
+            {group: self._pool.submit(STATS_FUNCTIONS[group], df) for group in groups}
+            for df in frames
+        ]
+        return [{group: future.result() for group, future in query.items()} for query in futures]
+
+    def stats(self, groups: Union[str, List[str], None] = None, **filters: str) -> Dict:
+        """
+        Computes the stats groups of one query, in parallel.
+
+        Args:
+            (str or list) groups - stats groups to compute, DEFAULT_GROUPS if None
+            (str) filters - values keyed by filter keyword, as given to select()
+        Returns:
+            dict: the result of each stats function keyed by group name.
+        """
+        return self.run([filters], groups)[0]
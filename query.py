@@ -0,0 +1,227 @@
+from tools.imports import *
+from tools.constants import *
+from bike_investigation import time_stats, station_stats, trip_duration_stats, user_stats
+from flow import flow_stats
+
+
+log = logging.getLogger("Bike")
+
+# Raw columns each stats group needs (missing ones, e.g. Washington's Gender, are skipped)
+STATS_COLUMNS = {
+    'time': [START_TIME],
+    'station': ['Start Station', 'End Station'],
+    'duration': ['Trip Duration'],
+    'user': ['User Type', 'Gender', 'Birth Year'],
+    'flow': [START_TIME, END_TIME, 'Start Station', 'End Station'],
+}
+STATS_FUNCTIONS = {
+    'time': time_stats,
+    'station': station_stats,
+    'duration': trip_duration_stats,
+    'user': user_stats,
+    'flow': flow_stats,
+}
+# Groups computed when none are requested, the ones displayed by the CLI
+DEFAULT_GROUPS = ['time', 'station', 'duration', 'user']
+# Filter keyword -> column it is applied on (month and day are derived from 'Start Time')
+FILTER_COLUMNS = {
+    'month': MONTH,
+    'day': DAY,
+    'user_type': 'User Type',
+    'gender': 'Gender',
+    'start_station': 'Start Station',
+    'end_station': 'End Station',
+}
+
+
+class Trips:
+    """
+    Lazy query over the trips of one city.
+
+    Nothing is read until collect() or stats() is called. Filters are only recorded by where(),
+    and plan() decides which columns to read from the CSV, which derived columns to compute and
+    in which order the filters are applied.
+
+    Example:
+        Trips('chicago').where(month='march').where(user_type='Subscriber').stats(['time', 'duration'])
+    """
+
+    def __init__(self, city: str, filters: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            (str) city - name of the city to analyze
+            (dict) filters - filters already applied to the query, keyed by filter keyword
+        Raises:
+            TypeError: If the city is not a str
+            KeyError: If there is no data for the city
+        """
+        if not isinstance(city, str):
+            raise TypeError("City must be a str parameter")
+        city = city.lower()
+        if city not in CITY_DATA:
+            raise KeyError(f"There is no data for {city} city")
+        self.city = city
+        self.filters = dict(filters or {})
+
+    def __repr__(self) -> str:
+        return f"Trips({self.city!r}, filters={self.filters!r})"
+
+    def where(self, **filters: str) -> 'Trips':
+        """
+        Returns a new query with the given filters added. A filter set to "all" is removed,
+        and a filter given twice keeps the last value.
+
+        Args:
+            (str) filters - values keyed by filter keyword (month, day, user_type, gender, start_station, end_station)
+        Returns:
+            (Trips) - a new query, the current one is left unchanged.
+        Raises:
+            TypeError: If a filter value is not a str
+            KeyError: If a filter keyword is unknown, or a month or day is not in MONTHS or DAYS
+        """
+        merged = check_filters(filters, self.filters)
+        return Trips(self.city, merged)
+
+    def plan(self, groups: Union[str, List[str], None] = None) -> Dict:
+        """
+        Plans the work needed to answer the query without loading any row.
+
+        Args:
+            (str or list) groups - stats groups to compute (time, station, duration, user, flow), DEFAULT_GROUPS if None
+        Returns:
+            dict: Contains:
+                - 'path': the CSV file to read,
+                - 'columns': the columns to read, in file order,
+                - 'derived': the columns computed from 'Start Time',
+                - 'filters': the (column, value) filters in the order they are applied.
+        Raises:
+            KeyError: If a stats group is unknown or a filter column is missing from the city data.
+        """
+        groups = check_groups(groups)
+        path = CITY_DATA[self.city]
+        header = pd.read_csv(path, nrows=0).columns
+
+        derived = []
+        if 'time' in groups or 'month' in self.filters:
+            derived.append(MONTH)
+        if 'time' in groups or 'day' in self.filters:
+            derived.append(DAY)
+        if 'time' in groups:
+            derived.append('start_hour')
+
+        needed = {col for group in groups for col in STATS_COLUMNS[group]}
+        if derived:
+            needed.add(START_TIME)
+        # Filters on raw columns come first, so that 'Start Time' is parsed on fewer rows
+        raw_filters, derived_filters = [], []
+        for key, value in self.filters.items():
+            col = FILTER_COLUMNS[key]
+            if col in derived:
+                derived_filters.append((col, value))
+                continue
+            if col not in header:
+                raise KeyError(f"There is no {col} column for {self.city} city")
+            needed.add(col)
+            raw_filters.append((col, value))
+        if derived and START_TIME not in header:
+            raise KeyError(f"The {self.city} data doesn't contain a Start Time column")
+
+        return {
+            'path': path,
+            'columns': [col for col in header if col in needed],
+            'derived': derived,
+            'filters': raw_filters + derived_filters,
+        }
+
+    def collect(self, groups: Union[str, List[str], None] = None) -> pd.DataFrame:
+        """
+        Executes the query plan and returns the filtered data.
+
+        Args:
+            (str or list) groups - stats groups the data will be used for, DEFAULT_GROUPS if None
+        Returns:
+            (pd.DataFrame) - the planned columns of the city data, filtered and with the derived columns.
+        """
+        plan = self.plan(groups)
+        df = pd.read_csv(plan['path'], usecols=plan['columns'])
+        log.info(f"Successfully loaded {plan['columns']} for {self.city} from {plan['path']}")
+
+        # Raw filters first, then 'Start Time' is parsed once on the remaining rows
+        for col, value in plan['filters']:
+            if col not in plan['derived']:
+                df = df[df[col] == value]
+        if plan['derived']:
+            df = _derive(df, plan['derived'])
+        for col, value in plan['filters']:
+            if col in plan['derived']:
+                df = df[df[col] == value]
+        return df.reset_index(drop=True)
+
+    def stats(self, groups: Union[str, List[str], None] = None) -> Dict:
+        """
+        Computes the requested stats groups on the query result.
+
+        Args:
+            (str or list) groups - stats groups to compute (time, station, duration, user, flow), DEFAULT_GROUPS if None
+        Returns:
+            dict: the result of each stats function keyed by group name.
+        """
+        groups = check_groups(groups)
+        df = self.collect(groups)
+        return {group: STATS_FUNCTIONS[group](df) for group in groups}
+
+
+def check_filters(filters: Dict[str, str], current: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Checks filters and merges them into the current ones. A filter set to "all" is removed.
+
+    Args:
+        (dict) filters - values keyed by filter keyword
+        (dict) current - filters already applied
+    Returns:
+        (dict) - the merged filters, month and day lowercased.
+    Raises:
+        TypeError: If a filter value is not a str
+        KeyError: If a filter keyword is unknown, or a month or day is not in MONTHS or DAYS
+    """
+    merged = dict(current or {})
+    for key, value in filters.items():
+        if key not in FILTER_COLUMNS:
+            raise KeyError(f"Unknown filter {key}, choose from {list(FILTER_COLUMNS)}")
+        if not isinstance(value, str):
+            raise TypeError(f"The {key} filter must be a str parameter")
+        if key in ('month', 'day'):
+            value = value.lower()
+            choices = MONTHS if key == 'month' else DAYS
+            if value not in choices:
+                raise KeyError(f"Unknown {key} {value}, choose from {choices}")
+        if value == 'all':
+            merged.pop(key, None)
+        else:
+            merged[key] = value
+    return merged
+
+
+def check_groups(groups: Union[str, List[str], None]) -> List[str]:
+    """Returns groups as a list, checking that every group is a known stats group."""
+    if groups is None:
+        return list(DEFAULT_GROUPS)
+    if isinstance(groups, str):
+        groups = [groups]
+    for group in groups:
+        if group not in STATS_FUNCTIONS:
+            raise KeyError(f"Unknown stats group {group}, choose from {list(STATS_FUNCTIONS)}")
+    return list(groups)
+
+
+def _derive(df: pd.DataFrame, derived: List[str]) -> pd.DataFrame:
+    """Parses 'Start Time' and adds the derived columns."""
+    start = pd.to_datetime(df[START_TIME], errors='coerce')
+    columns = {START_TIME: start}
+    if MONTH in derived:
+        columns[MONTH] = start.dt.month_name().str.lower()
+    if DAY in derived:
+        columns[DAY] = start.dt.day_name().str.lower()
+    if 'start_hour' in derived:
+        columns['start_hour'] = start.dt.hour
+    return df.assign(**columns)
@@ -0,0 +1,153 @@
+from tools.imports import *
+from tools.constants import *
+from normalize import parse_times
+
+
+log = logging.getLogger("Bike")
+
+
+class _WindowAccumulator:
+    """
+    Counts of the trips currently inside a window: start hours, start and end stations, and the sum and
+    count of valid trip durations. Trips are added and removed by slices of the time-sorted arrays.
+    """
+
+    def __init__(self, hours: np.ndarray, start_codes: np.ndarray, end_codes: np.ndarray,
+                 durations: np.ndarray, n_stations: int):
+        self._hours = hours
+        self._start_codes = start_codes
+        self._end_codes = end_codes
+        self._durations = durations
+        self.trips = 0
+        self.hour_counts = np.zeros(24, dtype=np.int64)
+        self.start_counts = np.zeros(n_stations, dtype=np.int64)
+        self.end_counts = np.zeros(n_stations, dtype=np.int64)
+        self.duration_sum = 0.0
+        self.duration_count = 0
+
+    def update(self, lo: int, hi: int, sign: int) -> None:
+        """Adds (sign=1) or removes (sign=-1) the trips lo to hi-1."""
+        if lo >= hi:
+            return
+        self.trips += sign * (hi - lo)
+        self.hour_counts += sign * np.bincount(self._hours[lo:hi], minlength=24)
+        for counts, codes in ((self.start_counts, self._start_codes), (self.end_counts, self._end_codes)):
+            codes = codes[lo:hi]
+            counts += sign * np.bincount(codes[codes >= 0], minlength=len(counts))
+        durations = self._durations[lo:hi]
+        valid = ~np.isnan(durations)
+        self.duration_sum += sign * float(durations[valid].sum())
+        self.duration_count += sign * int(valid.sum())
+
+
+def _top(counts: np.ndarray, names: np.ndarray, top: int) -> List[str]:
+    """Returns the names of the top most counted stations, ties ordered by name."""
+    order = np.argsort(-counts, kind='stable')[:top]
+    return [names[i] for i in order if counts[i] > 0]
+
+
+def rolling_stats(df: pd.DataFrame, window: str = '7D', step: str = '1D', top: int = 3,
+                  anchor: str = 'day') -> pd.DataFrame:
+    """
+    Computes the most common start hour, the top start and end stations and the mean travel time over
+    sliding windows, in a single pass over the time-sorted trips.
+
+    The windows [end - window, end) end at every step after the anchor, midnight of the first trip's day or
+    of the Monday of its week, until the first end after the last trip. Moving to the next window adds the trips that entered it and removes the ones that
+    left it from running counts, instead of computing the stats again on every window.
+
+    Args:
+        (pd.DataFrame) df - trips with 'Start Time', 'Start Station', 'End Station' and 'Trip Duration' columns
+        (str) window - length of a window, as a pandas offset (e.g. '7D', '30D')
+        (str) step - distance between two window ends, as a pandas offset
+        (int) top - number of top stations kept per window
+        (str) anchor - 'day' or 'week', the windows start from the day or the Monday of the first trip
+    Returns:
+        (pd.DataFrame) - one row per window, indexed by window end, with columns:
+            - 'window_start': start of the window,
+            - 'trips': number of trips in the window,
+            - 'mostCommonStartHour': most common start hour(s), None for an empty window,
+            - 'topStartStations', 'topEndStations': the top start and end stations,
+            - 'mean_travel_time': mean trip duration in seconds, NaN without valid duration.
+    Raises:
+        ValueError: If the DataFrame is empty, lacks valid 'Start Time' data or the anchor is unknown.
+        KeyError: If a required column is missing.
+    """
+    if df.empty:
+        raise ValueError("The given dataframe is empty")
+    missing = [col for col in (START_TIME, 'Start Station', 'End Station', 'Trip Duration') if col not in df.columns]
+    if missing:
+        raise KeyError(f"The dataframe doesn't contain required columns {missing}")
+    if anchor not in ('day', 'week'):
+        raise ValueError(f"Unknown anchor {anchor}, choose from ['day', 'week']")
+
+    start = df[START_TIME]
+    if not is_datetime64_any_dtype(start):
+        start = parse_times(start)
+    valid = start.notna().to_numpy()
+    if not valid.any():
+        raise ValueError("No valid 'Start Time' data available")
+    order = np.argsort(start.to_numpy()[valid], kind='stable')
+    times = start.to_numpy()[valid][order]
+
+    durations = df['Trip Duration']
+    if not is_numeric_dtype(durations):
+        durations = pd.to_numeric(durations, errors='coerce')
+    durations = durations.to_numpy(dtype=float)[valid][order]
+    # Shared station codes, sorted by name so that ties are broken by name
+    names = np.array(sorted(set(df['Start Station'].dropna()) | set(df['End Station'].dropna())), dtype=object)
+    start_codes = pd.Categorical(df['Start Station'], categories=names).codes[valid][order]
+    end_codes = pd.Categorical(df['End Station'], categories=names).codes[valid][order]
+    hours = pd.DatetimeIndex(times).hour.to_numpy()
+
+    window, step = pd.Timedelta(window), pd.Timedelta(step)
+    first_day = pd.Timestamp(times[0]).normalize()
+    if anchor == 'week':
+        first_day -= pd.Timedelta(days=first_day.dayofweek)
+    # Enough steps for the last window to end after the last trip
+    periods = int((pd.Timestamp(times[-1]) - first_day) // step) + 1
+    ends = pd.date_range(first_day + step, periods=periods, freq=step)
+    # Window bounds as positions in the sorted times, both move forward only
+    his = np.searchsorted(times, ends.to_numpy(), side='left')
+    los = np.searchsorted(times, (ends - window).to_numpy(), side='left')
+
+    acc = _WindowAccumulator(hours, start_codes, end_codes, durations, len(names))
+    rows = []
+    lo = hi = 0
+    for end, new_lo, new_hi in zip(ends, los, his):
+        acc.update(hi, new_hi, 1)
+        acc.update(lo, new_lo, -1)
+        lo, hi = new_lo, new_hi
+        hour_max = acc.hour_counts.max()
+        rows.append({
+            'window_start': end - window,
+            'trips': acc.trips,
+            'mostCommonStartHour': np.flatnonzero(acc.hour_counts == hour_max).tolist() if hour_max > 0 else None,
+            'topStartStations': _top(acc.start_counts, names, top),
+            'topEndStations': _top(acc.end_counts, names, top),
+            'mean_travel_time': acc.duration_sum / acc.duration_count if acc.duration_count else np.nan,
+        })
+    log.info(f"Computed {len(rows)} windows of {window} every {step}")
+    return pd.DataFrame(rows, index=pd.DatetimeIndex(ends, name='window_end'))
+
+
+def week_over_week(df: pd.DataFrame, top: int = 3) -> pd.DataFrame:
+    """
+    Computes the rolling_stats of consecutive calendar weeks, Monday to Sunday, and their change from
+    the previous week. The change after a week without trips is NaN.
+
+    Args:
+        (pd.DataFrame) df - trips, as for rolling_stats
+        (int) top - number of top stations kept per week
+    Returns:
+        (pd.DataFrame) - the weekly rolling_stats with two more columns:
+            - 'trips_change': relative change of the number of trips from the previous week,
+            - 'mean_travel_time_change': relative change of the mean travel time from the previous week.
+    """
+    weeks = rolling_stats(df, window='7D', step='7D', top=top, anchor='week')
+    # A week without trips gives a NaN change, not inf
+    weeks['trips_change'] = weeks['trips'] / weeks['trips'].shift().replace(0, np.nan) - 1
+    weeks['mean_travel_time_change'] = (
+        weeks['mean_travel_time'] / weeks['mean_travel_time'].shift().replace(0, np.nan) - 1
+    )
+    return weeks
@@ -341,5 +341,24 @@ class TestBikeShareData(unittest.TestCase):
         self.assertEqual(result['most_common_birth'], expect_most_common, "Most common birth year should be 1980.")
 
 
+    #     ---------- TESTS Input not modified ----------
+
+    def test_stats_do_not_modify_input(self):
+        """Test that the stats functions leave the given DataFrame unchanged."""
+        df = pd.DataFrame({
+            START_TIME: ['2017-01-02 09:07:57', 'invalid', '2017-02-01 10:07:57'],
+            'Start Station': ['Station A', 'Station B', 'Station A'],
+            'End Station': ['Station D', 'Station E', 'Station D'],
+            'Trip Duration': [600, 'text', 1200],
+            'Birth Year': [1980, 'invalid', 1990],
+        })
+        expected = df.copy()
+        time_stats(df)
+        station_stats(df)
+        trip_duration_stats(df)
+        user_stats(df)
+        pd.testing.assert_frame_equal(df, expected)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
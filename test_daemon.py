@@ -0,0 +1,132 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import bike_investigation
+import normalize
+from daemon import Daemon, ask_daemon
+from tools.imports import *
+from tools.constants import *
+
+
+CHICAGO = pd.DataFrame({
+    START_TIME: ['2017-03-01 09:07:57', '2017-03-01 09:30:00', '2017-03-08 17:00:00', '2017-04-03 09:00:00'],
+    END_TIME: ['2017-03-01 09:20:57', '2017-03-01 09:40:00', '2017-03-08 17:30:00', '2017-04-03 09:10:00'],
+    'Trip Duration': [780, 600, 1800, 600],
+    'Start Station': ['Station A', 'Station B', 'Station A', 'Station C'],
+    'End Station': ['Station D', 'Station D', 'Station E', 'Station D'],
+    'User Type': ['Subscriber', 'Customer', 'Subscriber', 'Subscriber'],
+})
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_entry_point_does_not_import_pandas(self):
+        """Test that importing the entry point and the daemon client leaves numpy and pandas unloaded."""
+        statement = "import sys, bike_investigation, daemon; print('numpy' in sys.modules, 'pandas' in sys.modules)"
+        result = subprocess.run([sys.executable, '-c', statement], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(result.stdout.strip(), "False False")
+
+
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        path = os.path.join(self.tmp.name, 'chicago.csv')
+        CHICAGO.to_csv(path, index=False)
+        patcher = mock.patch.dict(CITY_DATA, {'chicago': path})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.key_file = os.path.join(self.tmp.name, 'run', 'daemon.key')
+        self.daemon = Daemon(('localhost', 0), self.key_file, os.path.join(self.tmp.name, 'normalized'), timeout=0.5)
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+        self.addCleanup(self.stop)
+
+    def ask(self, request, **kwargs):
+        return ask_daemon(request, self.daemon.address, self.key_file, **kwargs)
+
+    def stop(self):
+        if self.thread.is_alive():
+            self.ask({'command': 'stop'})
+            self.thread.join(timeout=5)
+
+    def test_key_file_is_private(self):
+        """Test that the key file is random, readable by its owner only, and removed when the daemon stops."""
+        self.assertEqual(os.stat(self.key_file).st_mode & 0o777, 0o600)
+        self.assertEqual(os.stat(os.path.dirname(self.key_file)).st_mode & 0o777, 0o700)
+        with open(self.key_file, 'rb') as file:
+            self.assertEqual(len(file.read()), 32)
+        self.stop()
+        self.assertFalse(os.path.exists(self.key_file))
+
+    def test_no_daemon(self):
+        """Test that ask_daemon returns None when nothing listens or the key file is missing."""
+        self.stop()
+        self.assertIsNone(self.ask({'city': 'chicago', 'month': 'all', 'day': 'all'}))
+        self.assertIsNone(ask_daemon({'city': 'chicago', 'month': 'all', 'day': 'all'}, self.daemon.address,
+                                     os.path.join(self.tmp.name, 'missing.key')))
+
+    def test_wrong_or_public_key(self):
+        """Test that a client with another key or with a key readable by others gets no answer."""
+        other = os.path.join(self.tmp.name, 'other.key')
+        with open(other, 'wb') as file:
+            file.write(b'0' * 32)
+        os.chmod(other, 0o600)
+        self.assertIsNone(ask_daemon({'city': 'chicago', 'month': 'all', 'day': 'all'}, self.daemon.address, other))
+        os.chmod(self.key_file, 0o644)
+        with self.assertLogs('Bike', level='WARNING'):
+            self.assertIsNone(self.ask({'city': 'chicago', 'month': 'all', 'day': 'all'}))
+        os.chmod(self.key_file, 0o600)
+        self.assertIsNone(self.ask({'city': 'chicago', 'month': 'all', 'day': 'all'})['error'])
+
+    def test_silent_client_does_not_block(self):
+        """Test that a client connecting without sending anything is dropped and the daemon keeps serving."""
+        with socket.create_connection(self.daemon.address):
+            reply = self.ask({'city': 'chicago', 'month': 'all', 'day': 'all'})
+        self.assertIsNone(reply['error'])
+
+    def test_silent_or_closing_server(self):
+        """Test that ask_daemon returns None when the peer never answers or closes the connection."""
+        with socket.create_server(('localhost', 0)) as server:
+            address = server.getsockname()[:2]
+            self.assertIsNone(ask_daemon({'command': 'stop'}, address, self.key_file, timeout=0.2))
+            peer, _ = server.accept()
+            peer.close()
+            self.assertIsNone(ask_daemon({'command': 'stop'}, address, self.key_file, timeout=0.2))
+
+    def test_request_reuses_loaded_data(self):
+        """Test that repeated requests are answered from the normalized data loaded by the first one."""
+        with mock.patch('normalize.load_normalized', wraps=normalize.load_normalized) as load_mock:
+            first = self.ask({'city': 'chicago', 'month': 'march', 'day': 'all'})
+            second = self.ask({'city': 'chicago', 'month': 'april', 'day': 'monday'})
+        self.assertEqual(load_mock.call_count, 1)
+        self.assertIsNone(first['error'])
+        self.assertIn("The most common month is march", first['output'])
+        self.assertIn("Total travel time: 0 hours, 53 minutes, 0 seconds", first['output'])
+        self.assertIn("The most common start station is Station C", second['output'])
+
+    def test_request_error(self):
+        """Test that an error is sent back and the daemon keeps serving."""
+        reply = self.ask({'city': 'chicago', 'month': 'june', 'day': 'all'})
+        self.assertIn("ValueError", reply['error'])
+        reply = self.ask({'city': 'chicago', 'month': 'all', 'day': 'all'})
+        self.assertIsNone(reply['error'])
+
+    def test_stop(self):
+        """Test that the stop command ends serve_forever."""
+        reply = self.ask({'command': 'stop'})
+        self.thread.join(timeout=5)
+        self.assertEqual(reply['output'], "Daemon stopped.\n")
+        self.assertFalse(self.thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
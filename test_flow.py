@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from flow import concurrency, hourly_concurrency, station_flow, flow_stats
+from query import Trips
+from tools.imports import *
+from tools.constants import *
+
+
+TRIPS = pd.DataFrame({
+    START_TIME: ['2017-03-01 09:00:00', '2017-03-01 09:10:00', '2017-03-01 09:20:00', '2017-03-01 11:30:00',
+                 '2017-03-02 09:00:00'],
+    END_TIME: ['2017-03-01 09:20:00', '2017-03-01 10:15:00', '2017-03-01 09:40:00', '2017-03-01 11:45:00',
+               '2017-03-02 09:30:00'],
+    'Start Station': ['Station A', 'Station A', 'Station B', 'Station C', 'Station A'],
+    'End Station': ['Station B', 'Station C', 'Station A', 'Station A', 'Station B'],
+    'Trip Duration': [1200, 3900, 1200, 900, 1800],
+})
+
+
+class TestFlow(unittest.TestCase):
+
+    def test_invalid_dataframe(self):
+        """Test empty DataFrame, missing 'End Time' and only invalid times. Expected ValueError or KeyError."""
+        self.assertRaises(ValueError, concurrency, TRIPS.iloc[:0])
+        self.assertRaises(KeyError, concurrency, TRIPS.drop(columns=[END_TIME]))
+        reversed_trips = TRIPS.assign(**{END_TIME: TRIPS[START_TIME], START_TIME: TRIPS[END_TIME]})
+        self.assertRaises(ValueError, concurrency, reversed_trips)
+
+    def test_concurrency(self):
+        """Test the trips in progress, a trip ending when another starts is not counted twice."""
+        in_use = concurrency(TRIPS)
+        self.assertEqual(in_use[pd.Timestamp('2017-03-01 09:10:00')], 2)
+        self.assertEqual(in_use[pd.Timestamp('2017-03-01 09:20:00')], 2)
+        self.assertEqual(in_use.max(), 2)
+        self.assertEqual(in_use.iloc[-1], 0)
+
+    def test_concurrency_matches_pairwise_overlap(self):
+        """Test the sweep line against the naive overlap count at every event time."""
+        rng = np.random.default_rng(2)
+        start = pd.Timestamp('2017-01-01') + pd.to_timedelta(rng.integers(0, 3 * 86400, 400), unit='s')
+        end = start + pd.to_timedelta(rng.integers(0, 7200, 400), unit='s')
+        df = pd.DataFrame({START_TIME: start, END_TIME: end})
+        in_use = concurrency(df)
+        starts, ends = start.to_numpy(), end.to_numpy()
+        for time, count in in_use.items():
+            t = time.to_datetime64()
+            self.assertEqual(count, int(((starts <= t) & (ends > t)).sum()))
+
+    def test_hourly_concurrency(self):
+        """Test the hourly maximum, including hours without any event."""
+        hourly = hourly_concurrency(concurrency(TRIPS))
+        self.assertEqual(hourly[pd.Timestamp('2017-03-01 09:00:00')], 2)
+        self.assertEqual(hourly[pd.Timestamp('2017-03-01 10:00:00')], 1)
+        self.assertEqual(hourly[pd.Timestamp('2017-03-01 11:00:00')], 1)
+        self.assertEqual(hourly[pd.Timestamp('2017-03-01 12:00:00')], 0)
+
+    def test_station_flow(self):
+        """Test the hourly departures, arrivals and net flow per station."""
+        flow = station_flow(TRIPS)
+        self.assertEqual(flow.loc[('Station A', pd.Timestamp('2017-03-01 09:00:00'))].tolist(), [2, 1, -1])
+        self.assertEqual(flow.loc[('Station C', pd.Timestamp('2017-03-01 10:00:00'))].tolist(), [0, 1, 1])
+        self.assertEqual(flow['departures'].sum(), len(TRIPS))
+        self.assertEqual(flow['net_flow'].sum(), 0)
+
+    def test_station_flow_duplicate_index(self):
+        """Test concatenated trips with duplicate index labels and an invalid row. Expected doubled counts."""
+        invalid = TRIPS.iloc[:1].assign(**{END_TIME: 'invalid'})
+        flow = station_flow(pd.concat([TRIPS, invalid, TRIPS]))
+        self.assertEqual(flow.loc[('Station A', pd.Timestamp('2017-03-01 09:00:00'))].tolist(), [4, 2, -2])
+        self.assertEqual(flow['departures'].sum(), 2 * len(TRIPS))
+
+    def test_flow_stats(self):
+        """Test the peak of concurrent trips."""
+        result = flow_stats(TRIPS)
+        self.assertEqual(result['peakConcurrentTrips'], 2)
+        self.assertEqual(result['peakTime'], pd.Timestamp('2017-03-01 09:10:00'))
+
+    def test_flow_with_trips_filter(self):
+        """Test the flow group through Trips, honoring the day filter and reading 'End Time'."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'chicago.csv')
+            TRIPS.to_csv(path, index=False)
+            with mock.patch.dict(CITY_DATA, {'chicago': path}):
+                query = Trips('chicago').where(month='march', day='thursday')
+                self.assertEqual(query.plan('flow')['columns'], [START_TIME, END_TIME, 'Start Station', 'End Station'])
+                result = query.stats('flow')['flow']
+        self.assertEqual(result['peakConcurrentTrips'], 1)
+        self.assertEqual(result['stationFlow']['departures'].sum(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from normalize import parse_times, normalize, normalize_city, load_normalized
+from bike_investigation import time_stats, trip_duration_stats, user_stats, load_data
+from tools.imports import *
+from tools.constants import *
+
+
+RAW = pd.DataFrame({
+    'Unnamed: 0': [0, 1, 2, 3, 4],
+    START_TIME: ['2017-03-01 09:07:57', '01/03/2017 10:00:00', 'invalid', '2017-03-02 09:00:00', '2017-03-03 09:00:00'],
+    END_TIME: ['2017-03-01 09:20:00', '01/03/2017 10:30:00', '2017-03-01 11:00:00', '2017-03-02 09:10:00', '2017-03-03 09:10:00'],
+    'Trip Duration': [780, 1800, 600, 'text', 600],
+    'Start Station': ['Station A', 'Station B', 'Station A', 'Station C', None],
+    'End Station': ['Station D', 'Station D', 'Station E', 'Station D', 'Station E'],
+    'User Type': ['Subscriber', 'Customer', 'Subscriber', 'Subscriber', 'Customer'],
+    'Birth Year': [1980, 'unknown', 1985, None, 1990],
+})
+
+
+class TestNormalize(unittest.TestCase):
+
+    def test_parse_times_formats(self):
+        """Test that every timestamp format is parsed and invalid values become NaT."""
+        col = pd.Series(['2017-06-23 15:09:32', '23/06/2017 15:09:32', '6/23/2017 15:09', 'invalid', None])
+        result = parse_times(col)
+        self.assertEqual(list(result[:3]), [pd.Timestamp('2017-06-23 15:09:32')] * 2 + [pd.Timestamp('2017-06-23 15:09')])
+        self.assertTrue(result[3:].isna().all())
+
+    def test_missing_required_column(self):
+        """Test raw data without 'End Time'. Expected to raise KeyError."""
+        self.assertRaises(KeyError, normalize, RAW.drop(columns=[END_TIME]))
+
+    def test_normalize_schema_and_types(self):
+        """Test the canonical columns and types of the valid rows."""
+        clean, _, _ = normalize(RAW)
+        self.assertEqual(list(clean.columns), REQUIRED_COLUMNS + OPTIONAL_COLUMNS)
+        self.assertTrue(clean['Gender'].isna().all())
+        self.assertTrue(is_datetime64_any_dtype(clean[START_TIME]))
+        self.assertTrue(is_datetime64_any_dtype(clean[END_TIME]))
+        self.assertTrue(is_numeric_dtype(clean['Trip Duration']))
+        self.assertTrue(is_numeric_dtype(clean['Birth Year']))
+        self.assertEqual(list(clean['Trip Duration']), [780, 1800])
+
+    def test_missing_optional_columns(self):
+        """Test that a city without 'Gender' and 'Birth Year' gets them filled with NA."""
+        clean, _, report = normalize(RAW.drop(columns=['Birth Year']), 'washington')
+        self.assertEqual(list(clean.columns), REQUIRED_COLUMNS + OPTIONAL_COLUMNS)
+        self.assertTrue(clean['Birth Year'].isna().all())
+        self.assertEqual(clean['Birth Year'].dtype, float)
+        self.assertEqual(clean['Gender'].dtype, object)
+        self.assertEqual(report['missing_columns'], OPTIONAL_COLUMNS)
+        result = user_stats(clean)
+        self.assertIsNone(result['Gender'])
+        self.assertIsNone(result['earliest_birth'])
+
+    def test_quarantine_and_report(self):
+        """Test the quarantined rows and the validation report."""
+        _, quarantine, report = normalize(RAW, 'chicago')
+        self.assertEqual(list(quarantine['invalid_columns']), [START_TIME, 'Trip Duration', 'Start Station'])
+        self.assertEqual(list(quarantine['Unnamed: 0']), [2, 3, 4])
+        self.assertEqual(report['rows'], 5)
+        self.assertEqual(report['valid_rows'], 2)
+        self.assertEqual(report['quarantined_rows'], 3)
+        self.assertEqual(report['invalid'][START_TIME], 1)
+        self.assertEqual(report['coerced'], {'Birth Year': 1})
+        self.assertEqual(report['missing_columns'], ['Gender'])
+        self.assertEqual(report['dropped_columns'], ['Unnamed: 0'])
+        json.dumps(report)
+
+    def test_stats_on_normalized_data(self):
+        """Test that the stats functions give the same results on normalized data."""
+        clean, _, _ = normalize(RAW)
+        self.assertEqual(time_stats(clean.copy())['mostCommonStartHour'], [9, 10])
+        self.assertEqual(trip_duration_stats(clean)['total_travel_time'], 2580)
+        self.assertEqual(user_stats(clean.copy())['earliest_birth'], 1980)
+
+    def test_normalize_city_stores_result(self):
+        """Test that normalize_city stores the data and load_normalized reads it back."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'chicago.csv')
+            RAW.to_csv(path, index=False)
+            directory = os.path.join(tmp, 'normalized')
+            with mock.patch.dict(CITY_DATA, {'chicago': path}):
+                clean, report = normalize_city('chicago', directory)
+                self.assertTrue(os.path.exists(os.path.join(directory, 'chicago_report.json')))
+                with mock.patch('normalize.normalize') as normalize_mock:
+                    stored, stored_report = load_normalized('chicago', directory)
+                normalize_mock.assert_not_called()
+        pd.testing.assert_frame_equal(stored, clean)
+        self.assertEqual(stored_report, report)
+
+    def test_load_data_normalized(self):
+        """Test that load_data(normalized=True) builds on load_normalized instead of reading the raw CSV."""
+        clean, _, report = normalize(RAW, 'chicago')
+        with mock.patch('normalize.load_normalized', return_value=(clean, report)) as load_mock, \
+                mock.patch('pandas.read_csv') as read_mock, self.assertLogs('Bike', level='INFO') as logs:
+            df = load_data('chicago', 'march', 'wednesday', normalized=True)
+        self.assertIn(f"Successfully loaded normalized data for chicago from {NORMALIZED_DIR}", logs.output[0])
+        load_mock.assert_called_once_with('chicago')
+        read_mock.assert_not_called()
+        self.assertEqual(list(df['Trip Duration']), [780, 1800])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from parallel import SharedCity
+from bike_investigation import time_stats, station_stats, trip_duration_stats, user_stats
+from tools.imports import *
+from tools.constants import *
+
+
+def make_city(n: int = 2000) -> pd.DataFrame:
+    """Builds a deterministic city DataFrame of n trips."""
+    rng = np.random.default_rng(0)
+    stations = np.array([f"Station {c}" for c in 'ABCDEFGH'])
+    return pd.DataFrame({
+        START_TIME: pd.Timestamp('2017-01-01') + pd.to_timedelta(rng.integers(0, 181 * 86400, n), unit='s'),
+        'Trip Duration': rng.integers(60, 3600, n),
+        'Start Station': stations[rng.integers(0, 8, n)],
+        'End Station': stations[rng.integers(0, 8, n)],
+        'User Type': np.where(rng.random(n) < 0.8, 'Subscriber', 'Customer'),
+        'Gender': np.where(rng.random(n) < 0.6, 'Male', 'Female'),
+        'Birth Year': rng.integers(1940, 2001, n).astype(float),
+    })
+
+
+QUERIES = [
+    {},
+    {'month': 'march'},
+    {'user_type': 'Customer'},
+    {'day': 'sunday', 'gender': 'Female'},
+    {'month': 'june', 'user_type': 'Subscriber'},
+]
+
+
+class TestSharedCity(unittest.TestCase):
+
+    def setUp(self):
+        self.df = make_city()
+        self.city = SharedCity(self.df, max_workers=8)
+        self.addCleanup(self.city.close)
+
+    def test_invalid_dataframe(self):
+        """Test empty DataFrame and missing 'Start Time'. Expected ValueError and KeyError."""
+        self.assertRaises(ValueError, SharedCity, pd.DataFrame({START_TIME: []}))
+        self.assertRaises(KeyError, SharedCity, pd.DataFrame({'Trip Duration': [600]}))
+
+    def test_select(self):
+        """Test that select() returns the matching rows and rejects unknown filters."""
+        df = self.city.select(month='March', user_type='Customer')
+        self.assertTrue((df[MONTH] == 'march').all())
+        self.assertTrue((df['User Type'] == 'Customer').all())
+        self.assertRaises(KeyError, self.city.select, color='red')
+
+    def test_matches_sequential_stats(self):
+        """Test that the parallel results are the results of the sequential stats functions."""
+        results = self.city.run(QUERIES)
+        for filters, result in zip(QUERIES, results):
+            df = self.city.select(**filters)
+            self.assertEqual(result['time'], time_stats(df))
+            self.assertEqual(result['station'], station_stats(df))
+            self.assertEqual(result['duration'], trip_duration_stats(df))
+            self.assertEqual(result['user'], user_stats(df))
+
+    def test_deterministic_under_concurrency(self):
+        """Test that many concurrent runs over the shared data all give the same results."""
+        expected = self.city.run(QUERIES)
+        with ThreadPoolExecutor(max_workers=8) as clients:
+            runs = list(clients.map(lambda _: self.city.run(QUERIES), range(20)))
+        for result in runs:
+            self.assertEqual(result, expected)
+
+    def test_shared_data_unchanged(self):
+        """Test that neither the given DataFrame nor the shared data are modified by the queries."""
+        given = self.df.copy()
+        shared = self.city._df.copy()
+        self.city.run(QUERIES)
+        pd.testing.assert_frame_equal(self.df, given)
+        pd.testing.assert_frame_equal(self.city._df, shared)
+
+    def test_stats_single_query(self):
+        """Test stats() on one query with a subset of the groups."""
+        result = self.city.stats(['duration'], user_type='Customer')
+        self.assertEqual(list(result), ['duration'])
+        customers = self.df[self.df['User Type'] == 'Customer']
+        self.assertEqual(result['duration']['total_travel_time'], customers['Trip Duration'].sum())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from query import Trips
+from tools.imports import *
+from tools.constants import *
+
+
+CHICAGO = pd.DataFrame({
+    START_TIME: ['2017-03-01 09:07:57', '2017-03-01 09:30:00', '2017-03-08 17:00:00', '2017-04-03 09:00:00'],
+    'End Time': ['2017-03-01 09:20:00', '2017-03-01 09:40:00', '2017-03-08 17:30:00', '2017-04-03 09:10:00'],
+    'Trip Duration': [780, 600, 1800, 600],
+    'Start Station': ['Station A', 'Station B', 'Station A', 'Station C'],
+    'End Station': ['Station D', 'Station D', 'Station E', 'Station D'],
+    'User Type': ['Subscriber', 'Customer', 'Subscriber', 'Subscriber'],
+    'Gender': ['Male', 'Female', 'Female', 'Male'],
+    'Birth Year': [1980, 1990, 1985, 1990],
+})
+WASHINGTON = CHICAGO.drop(columns=['Gender', 'Birth Year'])
+
+
+class TestTrips(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        paths = {}
+        for city, df in (('chicago', CHICAGO), ('washington', WASHINGTON)):
+            paths[city] = os.path.join(self.tmp.name, f"{city}.csv")
+            df.to_csv(paths[city], index=False)
+        patcher = mock.patch.dict(CITY_DATA, paths)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_invalid_city(self):
+        """Test unknown city and non str city. Expected KeyError and TypeError."""
+        self.assertRaises(KeyError, Trips, 'paris')
+        self.assertRaises(TypeError, Trips, 42)
+
+    def test_invalid_filter_and_group(self):
+        """Test unknown filter keyword and stats group. Expected KeyError."""
+        self.assertRaises(KeyError, Trips('chicago').where, color='red')
+        self.assertRaises(TypeError, Trips('chicago').where, month=3)
+        self.assertRaises(KeyError, Trips('chicago').plan, ['weather'])
+
+    def test_invalid_month_and_day(self):
+        """Test misspelled or unavailable month and day. Expected KeyError before reading any data."""
+        self.assertRaises(KeyError, Trips('chicago').where, month='marhc')
+        self.assertRaises(KeyError, Trips('chicago').where, month='july')
+        self.assertRaises(KeyError, Trips('chicago').where, day='funday')
+        self.assertEqual(Trips('chicago').where(month='March', day='all').filters, {'month': 'march'})
+
+    def test_where_is_immutable(self):
+        """Test that where() returns a new query and 'all' removes a filter."""
+        base = Trips('chicago')
+        query = base.where(month='March').where(user_type='Subscriber')
+        self.assertEqual(base.filters, {})
+        self.assertEqual(query.filters, {'month': 'march', 'user_type': 'Subscriber'})
+        self.assertEqual(query.where(month='all').filters, {'user_type': 'Subscriber'})
+
+    def test_plan_reads_only_required_columns(self):
+        """Test that the plan only reads the columns needed by the requested stats and filters."""
+        plan = Trips('chicago').where(user_type='Subscriber').plan('duration')
+        self.assertEqual(plan['columns'], ['Trip Duration', 'User Type'])
+        self.assertEqual(plan['derived'], [])
+        plan = Trips('chicago').where(month='march').plan(['time', 'duration'])
+        self.assertEqual(plan['columns'], [START_TIME, 'Trip Duration'])
+        self.assertEqual(plan['derived'], [MONTH, DAY, 'start_hour'])
+
+    def test_plan_pushes_raw_filters_first(self):
+        """Test that filters on raw columns are applied before the ones on derived columns."""
+        plan = Trips('chicago').where(day='wednesday', user_type='Subscriber').plan('station')
+        self.assertEqual(plan['filters'], [('User Type', 'Subscriber'), (DAY, 'wednesday')])
+        self.assertEqual(plan['derived'], [DAY])
+
+    def test_plan_missing_columns_washington(self):
+        """Test that Washington's missing Gender and Birth Year are skipped, but a gender filter raises KeyError."""
+        plan = Trips('washington').plan('user')
+        self.assertEqual(plan['columns'], ['User Type'])
+        self.assertRaises(KeyError, Trips('washington').where(gender='Male').plan, 'user')
+
+    def test_collect(self):
+        """Test the filtered data returned by collect()."""
+        df = Trips('chicago').where(month='march').where(user_type='Subscriber').collect('duration')
+        self.assertEqual(list(df['Trip Duration']), [780, 1800])
+        self.assertNotIn('Gender', df.columns)
+
+    def test_stats_matches_eager_functions(self):
+        """Test stats() results on a filtered query."""
+        result = Trips('chicago').where(month='march').where(user_type='Subscriber').stats(['time', 'duration'])
+        self.assertEqual(sorted(result), ['duration', 'time'])
+        self.assertEqual(result['time']['mostCommonMonth'], ['march'])
+        self.assertEqual(result['time']['mostCommonDay'], ['wednesday'])
+        self.assertEqual(result['duration']['total_travel_time'], 2580)
+
+    def test_stats_user_washington(self):
+        """Test user stats on Washington, without Gender and Birth Year."""
+        result = Trips('washington').stats('user')
+        self.assertEqual(result['user']['User Type'], {'Subscriber': 3, 'Customer': 1})
+        self.assertIsNone(result['user']['Gender'])
+        self.assertIsNone(result['user']['earliest_birth'])
+
+
+if __name__ == '__main__':
+    unittest.main()
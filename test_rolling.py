@@ -0,0 +1,104 @@
+import unittest
+from rolling import rolling_stats, week_over_week
+from tools.imports import *
+from tools.constants import *
+
+
+def make_trips(n: int = 3000) -> pd.DataFrame:
+    """Builds deterministic, unsorted trips over the first six months of 2017."""
+    rng = np.random.default_rng(1)
+    stations = np.array([f"Station {c}" for c in 'ABCDEF'])
+    return pd.DataFrame({
+        START_TIME: (pd.Timestamp('2017-01-01') + pd.to_timedelta(rng.integers(0, 181 * 86400, n), unit='s')).astype(str),
+        'Trip Duration': rng.integers(60, 3600, n),
+        'Start Station': stations[rng.integers(0, 6, n)],
+        'End Station': stations[rng.integers(0, 6, n)],
+    })
+
+
+class TestRollingStats(unittest.TestCase):
+
+    def test_invalid_dataframe(self):
+        """Test empty DataFrame, missing column and invalid 'Start Time'. Expected ValueError or KeyError."""
+        self.assertRaises(ValueError, rolling_stats, pd.DataFrame({START_TIME: []}))
+        self.assertRaises(KeyError, rolling_stats, make_trips().drop(columns=['End Station']))
+        df = make_trips(2)
+        df[START_TIME] = 'invalid'
+        self.assertRaises(ValueError, rolling_stats, df)
+
+    def test_matches_recomputed_windows(self):
+        """Test that every 7 and 30 day window matches the stats recomputed on the trips of that window."""
+        df = make_trips()
+        start = pd.to_datetime(df[START_TIME])
+        for window in ('7D', '30D'):
+            result = rolling_stats(df, window=window, top=2)
+            for end, row in result.iterrows():
+                trips = df[(start >= row['window_start']) & (start < end)]
+                self.assertEqual(row['trips'], len(trips))
+                if trips.empty:
+                    self.assertIsNone(row['mostCommonStartHour'])
+                    continue
+                hours = pd.to_datetime(trips[START_TIME]).dt.hour
+                self.assertEqual(row['mostCommonStartHour'], sorted(hours.mode().tolist()))
+                counts = trips['Start Station'].value_counts()
+                expected = sorted(counts.index, key=lambda name: (-counts[name], name))[:2]
+                self.assertEqual(row['topStartStations'], expected)
+                self.assertAlmostEqual(row['mean_travel_time'], trips['Trip Duration'].mean())
+
+    def test_windows_cover_all_trips(self):
+        """Test that consecutive 1 day windows count every trip once."""
+        df = make_trips()
+        result = rolling_stats(df, window='1D')
+        self.assertEqual(result['trips'].sum(), len(df))
+        self.assertTrue(result.index.is_monotonic_increasing)
+
+    def test_invalid_values_skipped(self):
+        """Test that invalid start times, durations and missing stations are skipped."""
+        df = pd.DataFrame({
+            START_TIME: ['2017-01-02 09:00:00', 'invalid', '2017-01-02 10:00:00', '2017-01-03 09:00:00'],
+            'Trip Duration': [600, 300, 'text', 1200],
+            'Start Station': ['Station A', 'Station A', None, 'Station B'],
+            'End Station': ['Station C', 'Station C', 'Station C', 'Station C'],
+        })
+        result = rolling_stats(df, window='7D')
+        last = result.iloc[-1]
+        self.assertEqual(last['trips'], 3)
+        self.assertEqual(last['mostCommonStartHour'], [9])
+        self.assertEqual(last['topStartStations'], ['Station A', 'Station B'])
+        self.assertEqual(last['mean_travel_time'], 900)
+
+    def test_week_over_week(self):
+        """Test the weekly windows and their change from the previous week."""
+        df = pd.DataFrame({
+            START_TIME: ['2017-01-02 09:00:00', '2017-01-10 09:00:00', '2017-01-11 10:00:00'],
+            'Trip Duration': [600, 300, 900],
+            'Start Station': ['Station A', 'Station B', 'Station B'],
+            'End Station': ['Station C', 'Station C', 'Station C'],
+        })
+        result = week_over_week(df)
+        self.assertEqual(list(result['trips']), [1, 2])
+        self.assertEqual(list(result['window_start']), [pd.Timestamp('2017-01-02'), pd.Timestamp('2017-01-09')])
+        self.assertEqual(result['trips_change'].iloc[1], 1.0)
+        self.assertEqual(result['mean_travel_time_change'].iloc[1], 0.0)
+
+    def test_week_over_week_empty_week(self):
+        """Test that weeks start on Monday and that the change after an empty week is NaN, not inf."""
+        df = pd.DataFrame({
+            START_TIME: ['2017-01-04 09:00:00', '2017-01-05 09:00:00', '2017-01-18 10:00:00'],
+            'Trip Duration': [600, 300, 900],
+            'Start Station': ['Station A', 'Station B', 'Station B'],
+            'End Station': ['Station C', 'Station C', 'Station C'],
+        })
+        result = week_over_week(df)
+        self.assertEqual(list(result['window_start']), list(pd.date_range('2017-01-02', periods=3, freq='7D')))
+        self.assertEqual(list(result['trips']), [2, 0, 1])
+        np.testing.assert_array_equal(result['trips_change'].to_numpy(), [np.nan, -1.0, np.nan])
+        self.assertFalse(np.isinf(result['mean_travel_time_change']).any())
+
+    def test_invalid_anchor(self):
+        """Test unknown anchor. Expected ValueError."""
+        self.assertRaises(ValueError, rolling_stats, make_trips(10), anchor='month')
+
+
+if __name__ == '__main__':
+    unittest.main()
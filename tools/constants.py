@@ -3,6 +3,25 @@ CITY_DATA = {
     "new york city": "Bike_raw_data/new_york_city.csv",
     "washington": "Bike_raw_data/washington.csv",
 }
+MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'all']
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday', 'all']
 START_TIME = 'Start Time'
 DAY = 'day_of_week'
-MONTH = 'month'
\ No newline at end of file
+MONTH = 'month'
+
+END_TIME = 'End Time'
+NORMALIZED_DIR = "Bike_normalized_data"
+# Canonical schema shared by every city, optional columns are only kept when the city has them
+REQUIRED_COLUMNS = [START_TIME, END_TIME, 'Trip Duration', 'Start Station', 'End Station', 'User Type']
+OPTIONAL_COLUMNS = ['Gender', 'Birth Year']
+# Timestamp formats found in the city files, tried in this order
+TIME_FORMATS = ['%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M:%S', '%m/%d/%Y %H:%M']
+
+# Warm daemon answering repeated CLI invocations (see daemon.py)
+DAEMON_ADDRESS = ('localhost', 6339)
+# Random key written at --serve time, readable by its owner only
+DAEMON_KEY_FILE = '~/.bikeshare/daemon.key'
+# Seconds a connection may stay silent before it is dropped
+DAEMON_TIMEOUT = 5.0
+# Seconds a client waits for the stats, loading a city on its first request included
+DAEMON_REPLY_TIMEOUT = 120.0
@@ -2,6 +2,7 @@ import time
 
 import numpy as np
 import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
 from typing import List, Optional, Dict, Union, Tuple
 
 import logging
@@ -1,4 +1,8 @@
-from tools.imports import *
+from __future__ import annotations
+
+from typing import Optional
+
+from tools.lazy import pd
 
 def find_most_common(col: pd.Series, name_col: str) -> Optional[list]: 
     """